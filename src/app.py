@@ -4,20 +4,77 @@ Application Streamlit principale pour le tableau de bord des véhicules électri
 
 import streamlit as st
 import pandas as pd
-from pathlib import Path
+import plotly.io as pio
 from src.database import DuckDBManager
 from src.filters import FilterManager
 from src.visualizations import VisualizationEngine
-from typing import Dict
+from typing import Any, Dict, List, Tuple
 
 
+# Sérialisation JSON des figures Plotly avec orjson plutôt que le module json
+pio.json.config.default_engine = 'orjson'
+
+
+@st.cache_resource
+def _get_db_manager(db_path: str) -> DuckDBManager:
+    """
+    Ouvre la base de données une seule fois pour toutes les réexécutions.
+    
+    Args:
+        db_path: Chemin vers le fichier de base de données
+        
+    Returns:
+        Instance partagée du gestionnaire de base de données
+    """
+    return DuckDBManager(db_path)
+
+
+@st.cache_data(show_spinner=False)
+def _available_filters(record_count: int, db_path: str,
+                       _filter_manager: FilterManager) -> Dict[str, List[str]]:
+    """
+    Récupère les options de filtres en les conservant entre les réexécutions.
+    
+    Le nombre d'enregistrements et le chemin de la base servent de clé de cache :
+    les requêtes DISTINCT ne sont relancées qu'après un chargement ou un effacement.
+    
+    Args:
+        record_count: Nombre de véhicules dans la base de données
+        db_path: Chemin vers le fichier de base de données
+        _filter_manager: Gestionnaire de filtres (exclu de la clé de cache)
+        
+    Returns:
+        Dictionnaire avec les options de filtres
+    """
+    return _filter_manager.get_available_filters()
+
+
+@st.cache_data(show_spinner=False)
+def _compute_kpi(kpi_method: str, filters_key: Tuple, record_count: int, db_path: str,
+                 _db_manager: DuckDBManager) -> Any:
+    """
+    Calcule un ou plusieurs KPI en conservant le résultat entre les réexécutions.
+    
+    Args:
+        kpi_method: Nom de la méthode de calcul du DuckDBManager
+        filters_key: Représentation figée et triée des filtres
+        record_count: Nombre de véhicules dans la base de données
+        db_path: Chemin vers le fichier de base de données
+        _db_manager: Gestionnaire de base de données (exclu de la clé de cache)
+        
+    Returns:
+        Résultat de la méthode (DataFrame ou dictionnaire de DataFrames)
+    """
+    filters = {column: list(values) for column, values in filters_key}
+    return getattr(_db_manager, kpi_method)(filters)
+
 
 class DashboardApp:
     """Application principale du tableau de bord."""
     
     def __init__(self):
         """Initialise l'application et les composants."""
-        self.db_manager = DuckDBManager("ev_database.duckdb")
+        self.db_manager = _get_db_manager("ev_database.duckdb")
         self.filter_manager = FilterManager(self.db_manager)
         self.viz_engine = VisualizationEngine()
         self._initialize_session_state()
@@ -61,13 +118,9 @@ class DashboardApp:
             if st.button("🔄 Charger les données", use_container_width=True):
                 if uploaded_file is not None:
                     try:
-                        # Sauvegarder le fichier temporaire
-                        temp_path = "temp_upload.csv"
-                        with open(temp_path, "wb") as f:
-                            f.write(uploaded_file.getbuffer())
-                        
-                        # Charger dans DuckDB
-                        record_count = self.db_manager.load_csv(temp_path)
+                        # Charger dans DuckDB directement depuis la mémoire
+                        record_count = self.db_manager.load_csv_bytes(uploaded_file.getvalue())
+                        st.cache_data.clear()
                         st.session_state.data_loaded = True
                         st.session_state.record_count = record_count
                         
@@ -75,9 +128,6 @@ class DashboardApp:
                             st.success(f"✅ {record_count} véhicules chargés avec succès!")
                         else:
                             st.warning("⚠️ Aucun véhicule valide trouvé dans le fichier. Vérifiez que les colonnes brand, model, segment et car_body_type ne sont pas vides.")
-                        
-                        # Nettoyer le fichier temporaire
-                        Path(temp_path).unlink()
                     except Exception as e:
                         error_msg = str(e)
                         # Améliorer le message d'erreur
@@ -107,7 +157,11 @@ class DashboardApp:
         filters = {}
         
         if st.session_state.data_loaded:
-            available_filters = self.filter_manager.get_available_filters()
+            available_filters = _available_filters(
+                self.db_manager.get_record_count(),
+                self.db_manager.db_path,
+                self.filter_manager
+            )
             
             # Filtre par marque
             selected_brands = st.sidebar.multiselect(
@@ -157,6 +211,18 @@ class DashboardApp:
         
         st.subheader("📊 Indicateurs Clés de Performance (KPI)")
         
+        # Clé de cache indépendante de l'ordre de sélection des filtres
+        filters_key = tuple(sorted((k, tuple(sorted(v))) for k, v in filters.items()))
+        record_count = self.db_manager.get_record_count()
+        
+        # Les quatre KPI sont calculés et mis en cache ensemble
+        try:
+            kpis = _compute_kpi("calculate_all_kpis", filters_key, record_count,
+                                self.db_manager.db_path, self.db_manager)
+        except Exception as e:
+            st.error(f"Erreur lors du calcul des KPI: {str(e)}")
+            return
+        
         # Créer une grille 2x2
         col1, col2 = st.columns(2)
         col3, col4 = st.columns(2)
@@ -165,7 +231,7 @@ class DashboardApp:
         with col1:
             st.markdown("### KPI 1: Plage par Segment")
             try:
-                data = self.db_manager.calculate_kpi_1_range_by_segment(filters)
+                data = kpis['kpi_1']
                 if not data.empty:
                     fig = self.viz_engine.render_kpi_1_range_by_segment(data)
                     st.plotly_chart(fig, use_container_width=True)
@@ -178,7 +244,7 @@ class DashboardApp:
         with col2:
             st.markdown("### KPI 2: Accélération par Marque")
             try:
-                data = self.db_manager.calculate_kpi_2_acceleration_by_brand(filters)
+                data = kpis['kpi_2']
                 if not data.empty:
                     fig = self.viz_engine.render_kpi_2_acceleration_by_brand(data)
                     st.plotly_chart(fig, use_container_width=True)
@@ -191,7 +257,7 @@ class DashboardApp:
         with col3:
             st.markdown("### KPI 3: Batterie vs Efficacité")
             try:
-                data = self.db_manager.calculate_kpi_3_battery_vs_efficiency(filters)
+                data = kpis['kpi_3']
                 if not data.empty:
                     fig = self.viz_engine.render_kpi_3_battery_vs_efficiency(data)
                     st.plotly_chart(fig, use_container_width=True)
@@ -204,7 +270,7 @@ class DashboardApp:
         with col4:
             st.markdown("### KPI 4: Distribution par Type")
             try:
-                data = self.db_manager.calculate_kpi_4_distribution_by_body_type(filters)
+                data = kpis['kpi_4']
                 if not data.empty:
                     fig = self.viz_engine.render_kpi_4_distribution_by_body_type(data)
                     st.plotly_chart(fig, use_container_width=True)
@@ -220,6 +286,7 @@ class DashboardApp:
         with col1:
             if st.button("🗑️ Effacer les données", use_container_width=True):
                 self.db_manager.clear_all_data()
+                st.cache_data.clear()
                 st.session_state.data_loaded = False
                 st.session_state.record_count = 0
                 st.success("✅ Données effacées avec succès!")
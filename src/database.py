@@ -3,10 +3,56 @@ Module de gestion de la base de données DuckDB.
 Gère la connexion, la création du schéma et les requêtes SQL.
 """
 
+import io
+import os
+import threading
 import duckdb
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+
+
+# Schéma de la table vehicle_data, dans l'ordre des colonnes du CSV
+VEHICLE_DATA_SCHEMA: Dict[str, str] = {
+    'brand': 'VARCHAR',
+    'model': 'VARCHAR',
+    'top_speed_kmh': 'DECIMAL(6,2)',
+    'battery_capacity_kWh': 'DECIMAL(6,2)',
+    'battery_type': 'VARCHAR',
+    'number_of_cells': 'INTEGER',
+    'torque_nm': 'DECIMAL(8,2)',
+    'efficiency_wh_per_km': 'DECIMAL(6,2)',
+    'range_km': 'DECIMAL(8,2)',
+    'acceleration_0_100_s': 'DECIMAL(5,2)',
+    'fast_charging_power_kw_dc': 'DECIMAL(6,2)',
+    'fast_charge_port': 'VARCHAR',
+    'towing_capacity_kg': 'DECIMAL(8,2)',
+    'cargo_volume_l': 'DECIMAL(8,2)',
+    'seats': 'INTEGER',
+    'drivetrain': 'VARCHAR',
+    'segment': 'VARCHAR',
+    'length_mm': 'DECIMAL(8,2)',
+    'width_mm': 'DECIMAL(8,2)',
+    'height_mm': 'DECIMAL(8,2)',
+    'car_body_type': 'VARCHAR',
+    'source_url': 'VARCHAR',
+}
+
+# Configuration de la connexion : scans et agrégations parallélisés sur tous les cœurs
+DUCKDB_CONFIG: Dict[str, str] = {
+    'threads': str(os.cpu_count() or 1),
+    'memory_limit': '2GB',
+}
+
+# Colonnes critiques : les lignes où l'une d'elles est vide ne sont pas chargées
+REQUIRED_COLUMNS = ['brand', 'model', 'segment', 'car_body_type']
+
+# Colonnes texte à faible cardinalité, matérialisées en dtype pandas 'category'
+CATEGORICAL_COLUMNS = [
+    'brand', 'battery_type', 'fast_charge_port', 'drivetrain', 'segment', 'car_body_type'
+]
 
 
 class DuckDBManager:
@@ -20,42 +66,31 @@ class DuckDBManager:
             db_path: Chemin vers le fichier de base de données
         """
         self.db_path = db_path
-        self.conn = duckdb.connect(db_path)
+        self.conn = duckdb.connect(db_path, config=DUCKDB_CONFIG)
+        
+        # La connexion est partagée entre les sessions Streamlit mais n'est pas thread-safe :
+        # chaque exécution et la récupération de son résultat se font sous ce verrou
+        self._lock = threading.RLock()
         self._create_schema()
+        
+        # Nombre de lignes tenu à jour par les chargements et l'effacement
+        result = self.conn.execute("SELECT COUNT(*) FROM vehicle_data").fetchone()
+        self._row_count: int = result[0] if result else 0
+        
+        # Valeurs distinctes par colonne, associées au nombre de lignes lors du calcul
+        self._distinct_cache: Dict[str, Tuple[int, List[str]]] = {}
     
     def _create_schema(self) -> None:
         """Crée le schéma de la table vehicle_data s'il n'existe pas."""
-        self.conn.execute("""
-            CREATE TABLE IF NOT EXISTS vehicle_data (
-                brand VARCHAR,
-                model VARCHAR,
-                top_speed_kmh DECIMAL(6,2),
-                battery_capacity_kWh DECIMAL(6,2),
-                battery_type VARCHAR,
-                number_of_cells INTEGER,
-                torque_nm DECIMAL(8,2),
-                efficiency_wh_per_km DECIMAL(6,2),
-                range_km DECIMAL(8,2),
-                acceleration_0_100_s DECIMAL(5,2),
-                fast_charging_power_kw_dc DECIMAL(6,2),
-                fast_charge_port VARCHAR,
-                towing_capacity_kg DECIMAL(8,2),
-                cargo_volume_l DECIMAL(8,2),
-                seats INTEGER,
-                drivetrain VARCHAR,
-                segment VARCHAR,
-                length_mm DECIMAL(8,2),
-                width_mm DECIMAL(8,2),
-                height_mm DECIMAL(8,2),
-                car_body_type VARCHAR,
-                source_url VARCHAR
-            )
-        """)
+        columns = ",\n".join(
+            f"{name} {sql_type}" for name, sql_type in VEHICLE_DATA_SCHEMA.items()
+        )
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS vehicle_data ({columns})")
         
-        # Créer les index pour les colonnes fréquemment interrogées
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_brand ON vehicle_data(brand)")
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_segment ON vehicle_data(segment)")
-        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_car_body_type ON vehicle_data(car_body_type)")
+        # Pas d'index : les filtres IN s'appuient sur les zone maps du scan colonnaire.
+        # Supprimer ceux créés par les versions précédentes de la base.
+        for index in ('idx_brand', 'idx_segment', 'idx_car_body_type'):
+            self.conn.execute(f"DROP INDEX IF EXISTS {index}")
     
     def load_csv(self, csv_path: str) -> int:
         """
@@ -67,35 +102,84 @@ class DuckDBManager:
         Returns:
             Nombre de lignes insérées
         """
-        df = pd.read_csv(csv_path)
+        # Toutes les colonnes sont lues comme texte, sans inférence de types : la conversion
+        # est faite par _insert_from et les colonnes sont associées par leur nom d'en-tête
+        return self._insert_from("read_csv(?, header = true, all_varchar = true)", [csv_path])
+    
+    def load_csv_bytes(self, data: bytes) -> int:
+        """
+        Charge un fichier CSV reçu en mémoire, sans passer par un fichier temporaire.
+        
+        Args:
+            data: Contenu brut du fichier CSV
+            
+        Returns:
+            Nombre de lignes insérées
+        """
+        # Toutes les colonnes sont lues comme texte, la conversion est faite par _insert_from
+        table = pacsv.read_csv(
+            io.BytesIO(data),
+            convert_options=pacsv.ConvertOptions(
+                column_types={name: pa.string() for name in VEHICLE_DATA_SCHEMA},
+                strings_can_be_null=True
+            )
+        )
+        
+        return self.load_arrow(table)
+    
+    def load_arrow(self, table: pa.Table) -> int:
+        """
+        Charge une table Arrow dans la base de données.
+        
+        La table est enregistrée sans copie : DuckDB lit directement les buffers Arrow.
         
-        # Colonnes numériques à convertir
-        numeric_columns = [
-            'top_speed_kmh', 'battery_capacity_kWh', 'number_of_cells',
-            'torque_nm', 'efficiency_wh_per_km', 'range_km',
-            'acceleration_0_100_s', 'fast_charging_power_kw_dc',
-            'towing_capacity_kg', 'cargo_volume_l', 'seats',
-            'length_mm', 'width_mm', 'height_mm'
-        ]
+        Args:
+            table: Table Arrow avec les colonnes de vehicle_data
+            
+        Returns:
+            Nombre de lignes insérées
+        """
+        with self._lock:
+            self.conn.register('arrow_source', table)
+            try:
+                return self._insert_from("arrow_source")
+            finally:
+                self.conn.unregister('arrow_source')
+    
+    def _insert_from(self, source: str, params: Optional[List[Any]] = None) -> int:
+        """
+        Insère dans vehicle_data les lignes valides d'une source textuelle.
         
-        # Convertir les colonnes numériques, remplacer les valeurs invalides par NaN
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        Args:
+            source: Expression SQL de la source (table, vue ou fonction de lecture)
+            params: Paramètres de la requête
+            
+        Returns:
+            Nombre de lignes insérées
+        """
+        # Les colonnes sont lues comme texte puis converties par TRY_CAST :
+        # les valeurs numériques invalides deviennent NULL
+        columns = ",\n".join(
+            name if sql_type == 'VARCHAR' else f"TRY_CAST({name} AS {sql_type}) AS {name}"
+            for name, sql_type in VEHICLE_DATA_SCHEMA.items()
+        )
         
         # Filtrer les lignes avec des valeurs manquantes dans les colonnes critiques
-        # Garder les lignes où au moins brand, model et segment sont présents
-        df = df.dropna(subset=['brand', 'model', 'segment', 'car_body_type'], how='any')
+        not_null = " AND ".join(f"{name} IS NOT NULL" for name in REQUIRED_COLUMNS)
         
-        # Insérer les données
-        if len(df) > 0:
-            self.conn.register('temp_df', df)
-            self.conn.execute("""
-                INSERT INTO vehicle_data 
-                SELECT * FROM temp_df
-            """)
+        with self._lock:
+            result = self.conn.execute(f"""
+                INSERT INTO vehicle_data
+                SELECT {columns}
+                FROM {source}
+                WHERE {not_null}
+            """, params or []).fetchone()
+            
+            inserted = result[0] if result else 0
+            self._row_count += inserted
+            self._distinct_cache.clear()
         
-        return len(df)
+        return inserted
     
     def get_distinct_values(self, column: str) -> List[str]:
         """
@@ -107,13 +191,60 @@ class DuckDBManager:
         Returns:
             Liste des valeurs distinctes
         """
-        result = self.conn.execute(f"""
-            SELECT DISTINCT {column} FROM vehicle_data 
-            WHERE {column} IS NOT NULL
-            ORDER BY {column}
-        """).fetchall()
+        return self.get_distinct_values_many([column])[column]
+    
+    def get_distinct_values_many(self, columns: List[str]) -> Dict[str, List[str]]:
+        """
+        Récupère les valeurs distinctes de plusieurs colonnes en un seul scan.
+        
+        Les résultats sont mis en cache jusqu'au prochain chargement ou effacement ;
+        seules les colonnes absentes du cache sont interrogées.
         
-        return [row[0] for row in result]
+        Args:
+            columns: Noms des colonnes
+            
+        Returns:
+            Dictionnaire {colonne: liste triée des valeurs distinctes}
+        """
+        with self._lock:
+            missing = [
+                column for column in columns
+                if self._distinct_cache.get(column, (None, []))[0] != self._row_count
+            ]
+            
+            if missing:
+                aggregates = ", ".join(
+                    f"list_sort(array_agg(DISTINCT {column}) FILTER (WHERE {column} IS NOT NULL))"
+                    for column in missing
+                )
+                result = self.conn.execute(f"SELECT {aggregates} FROM vehicle_data").fetchone()
+                
+                for column, values in zip(missing, result):
+                    self._distinct_cache[column] = (self._row_count, values or [])
+            
+            return {column: list(self._distinct_cache[column][1]) for column in columns}
+    
+    @staticmethod
+    def _build_where(filters: Dict[str, List[str]]) -> Tuple[str, List[str]]:
+        """
+        Construit la clause WHERE paramétrée correspondant aux filtres.
+        
+        Args:
+            filters: Dictionnaire des filtres {colonne: [valeurs]}
+            
+        Returns:
+            Tuple (condition SQL avec des marqueurs ?, liste des paramètres)
+        """
+        where_parts = []
+        params = []
+        
+        for column, values in filters.items():
+            if values:
+                placeholders = ', '.join(['?'] * len(values))
+                where_parts.append(f"{column} IN ({placeholders})")
+                params.extend(values)
+        
+        return (" AND ".join(where_parts) or "1=1"), params
     
     def query_with_filters(self, filters: Dict[str, List[str]]) -> pd.DataFrame:
         """
@@ -125,14 +256,77 @@ class DuckDBManager:
         Returns:
             DataFrame avec les résultats filtrés
         """
-        query = "SELECT * FROM vehicle_data WHERE 1=1"
+        return self._to_categorical(self._select("*", filters))
+    
+    def query_with_filters_arrow(self, filters: Dict[str, List[str]]) -> pa.Table:
+        """
+        Exécute une requête avec filtres appliqués et renvoie le résultat au format Arrow.
         
-        for column, values in filters.items():
-            if values:
-                placeholders = ','.join([f"'{v}'" for v in values])
-                query += f" AND {column} IN ({placeholders})"
+        Le résultat est transféré par DuckDB sans passer par le bloc de données pandas.
+        
+        Args:
+            filters: Dictionnaire des filtres {colonne: [valeurs]}
+            
+        Returns:
+            Table Arrow avec les résultats filtrés
+        """
+        with self._lock:
+            return self._execute_select("*", filters).to_arrow_table()
+    
+    def _select(self, columns: str, filters: Dict[str, List[str]],
+                conditions: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Exécute une projection filtrée sur vehicle_data.
+        
+        Seules les colonnes demandées sont lues par le scan colonnaire.
         
-        return self.conn.execute(query).df()
+        Args:
+            columns: Liste SQL des colonnes à sélectionner
+            filters: Dictionnaire des filtres {colonne: [valeurs]}
+            conditions: Conditions SQL supplémentaires, combinées par AND
+            
+        Returns:
+            DataFrame avec les colonnes sélectionnées
+        """
+        with self._lock:
+            return self._execute_select(columns, filters, conditions).df()
+    
+    def _execute_select(self, columns: str, filters: Dict[str, List[str]],
+                        conditions: Optional[List[str]] = None) -> duckdb.DuckDBPyConnection:
+        """
+        Exécute une projection filtrée sur vehicle_data sans en matérialiser le résultat.
+        
+        Le résultat est porté par la connexion : l'appelant doit détenir le verrou
+        jusqu'à ce qu'il l'ait récupéré.
+        
+        Args:
+            columns: Liste SQL des colonnes à sélectionner
+            filters: Dictionnaire des filtres {colonne: [valeurs]}
+            conditions: Conditions SQL supplémentaires, combinées par AND
+            
+        Returns:
+            Connexion portant le résultat de la requête, à récupérer au format voulu
+        """
+        where, params = self._build_where(filters)
+        where = " AND ".join([where] + (conditions or []))
+        
+        return self.conn.execute(f"SELECT {columns} FROM vehicle_data WHERE {where}", params)
+    
+    @staticmethod
+    def _to_categorical(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Convertit les colonnes à faible cardinalité en dtype 'category'.
+        
+        Args:
+            df: DataFrame issu d'une requête sur vehicle_data
+            
+        Returns:
+            DataFrame avec les colonnes catégorielles converties
+        """
+        columns = [col for col in CATEGORICAL_COLUMNS if col in df.columns]
+        df[columns] = df[columns].astype('category')
+        
+        return df
     
     def calculate_kpi_1_range_by_segment(self, filters: Dict[str, List[str]]) -> pd.DataFrame:
         """
@@ -144,16 +338,16 @@ class DuckDBManager:
         Returns:
             DataFrame avec segment et range_km moyen
         """
-        df = self.query_with_filters(filters)
-        
-        if df.empty:
-            return pd.DataFrame(columns=['segment', 'average_range_km'])
-        
-        result = df.groupby('segment')['range_km'].mean().reset_index()
-        result.columns = ['segment', 'average_range_km']
-        result = result.sort_values('average_range_km', ascending=False)
+        where, params = self._build_where(filters)
         
-        return result
+        with self._lock:
+            return self.conn.execute(f"""
+                SELECT segment, AVG(range_km) AS average_range_km
+                FROM vehicle_data
+                WHERE {where}
+                GROUP BY segment
+                ORDER BY average_range_km DESC, segment
+            """, params).df()
     
     def calculate_kpi_2_acceleration_by_brand(self, filters: Dict[str, List[str]]) -> pd.DataFrame:
         """
@@ -163,18 +357,20 @@ class DuckDBManager:
             filters: Dictionnaire des filtres
             
         Returns:
-            DataFrame avec brand et acceleration_0_100_s moyen
+            DataFrame avec brand et acceleration_0_100_s moyen (15 marques au plus)
         """
-        df = self.query_with_filters(filters)
+        where, params = self._build_where(filters)
         
-        if df.empty:
-            return pd.DataFrame(columns=['brand', 'average_acceleration_s'])
-        
-        result = df.groupby('brand')['acceleration_0_100_s'].mean().reset_index()
-        result.columns = ['brand', 'average_acceleration_s']
-        result = result.sort_values('average_acceleration_s')
-        
-        return result
+        # Limiter à top 15 marques pour la lisibilité
+        with self._lock:
+            return self.conn.execute(f"""
+                SELECT brand, AVG(acceleration_0_100_s) AS average_acceleration_s
+                FROM vehicle_data
+                WHERE {where}
+                GROUP BY brand
+                ORDER BY average_acceleration_s, brand
+                LIMIT 15
+            """, params).df()
     
     def calculate_kpi_3_battery_vs_efficiency(self, filters: Dict[str, List[str]]) -> pd.DataFrame:
         """
@@ -186,14 +382,13 @@ class DuckDBManager:
         Returns:
             DataFrame avec battery_capacity_kWh, efficiency_wh_per_km et segment
         """
-        df = self.query_with_filters(filters)
-        
-        if df.empty:
-            return pd.DataFrame(columns=['battery_capacity_kWh', 'efficiency_wh_per_km', 'segment'])
+        df = self._select(
+            "battery_capacity_kWh, efficiency_wh_per_km, segment, brand, model",
+            filters,
+            ["battery_capacity_kWh IS NOT NULL", "efficiency_wh_per_km IS NOT NULL"]
+        )
         
-        result = df[['battery_capacity_kWh', 'efficiency_wh_per_km', 'segment', 'brand', 'model']].dropna()
-        
-        return result
+        return self._to_categorical(df)
     
     def calculate_kpi_4_distribution_by_body_type(self, filters: Dict[str, List[str]]) -> pd.DataFrame:
         """
@@ -205,27 +400,66 @@ class DuckDBManager:
         Returns:
             DataFrame avec car_body_type, count et percentage
         """
-        df = self.query_with_filters(filters)
+        where, params = self._build_where(filters)
         
-        if df.empty:
-            return pd.DataFrame(columns=['car_body_type', 'count', 'percentage'])
+        # Le pourcentage est calculé par une fonction de fenêtre sur les agrégats
+        with self._lock:
+            return self.conn.execute(f"""
+                SELECT
+                    car_body_type,
+                    COUNT(*) AS count,
+                    ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (), 2)::DOUBLE AS percentage
+                FROM vehicle_data
+                WHERE {where}
+                GROUP BY car_body_type
+                ORDER BY count DESC, car_body_type
+            """, params).df()
+    
+    def calculate_all_kpis(self, filters: Dict[str, List[str]]) -> Dict[str, pd.DataFrame]:
+        """
+        Calcule les quatre KPI pour un même jeu de filtres.
         
-        result = df['car_body_type'].value_counts().reset_index()
-        result.columns = ['car_body_type', 'count']
-        result['percentage'] = (result['count'] / result['count'].sum() * 100).round(2)
-        result = result.sort_values('count', ascending=False)
+        Le verrou est conservé pendant les quatre requêtes pour qu'elles portent
+        sur les mêmes données.
         
-        return result
+        Args:
+            filters: Dictionnaire des filtres
+            
+        Returns:
+            Dictionnaire {'kpi_1', 'kpi_2', 'kpi_3', 'kpi_4'} des DataFrames des KPI
+        """
+        with self._lock:
+            return {
+                'kpi_1': self.calculate_kpi_1_range_by_segment(filters),
+                'kpi_2': self.calculate_kpi_2_acceleration_by_brand(filters),
+                'kpi_3': self.calculate_kpi_3_battery_vs_efficiency(filters),
+                'kpi_4': self.calculate_kpi_4_distribution_by_body_type(filters),
+            }
     
     def clear_all_data(self) -> None:
         """Supprime toutes les données de la table."""
-        self.conn.execute("DELETE FROM vehicle_data")
+        with self._lock:
+            self.conn.execute("TRUNCATE vehicle_data")
+            self._row_count = 0
+            self._distinct_cache.clear()
+    
+    def refresh_state(self) -> None:
+        """
+        Resynchronise l'état tenu côté Python avec la base de données.
+        
+        À appeler après un contrôle de transaction externe (ROLLBACK par exemple) :
+        le nombre de lignes est relu et le cache des valeurs distinctes est vidé.
+        """
+        with self._lock:
+            result = self.conn.execute("SELECT COUNT(*) FROM vehicle_data").fetchone()
+            self._row_count = result[0] if result else 0
+            self._distinct_cache.clear()
     
     def get_record_count(self) -> int:
         """Retourne le nombre total de véhicules dans la base de données."""
-        result = self.conn.execute("SELECT COUNT(*) FROM vehicle_data").fetchone()
-        return result[0] if result else 0
+        return self._row_count
     
     def close(self) -> None:
         """Ferme la connexion à la base de données."""
-        self.conn.close()
+        with self._lock:
+            self.conn.close()
@@ -26,11 +26,7 @@ class FilterManager:
         Returns:
             Dictionnaire avec les options de filtres
         """
-        return {
-            'brand': self.db_manager.get_distinct_values('brand'),
-            'segment': self.db_manager.get_distinct_values('segment'),
-            'car_body_type': self.db_manager.get_distinct_values('car_body_type'),
-        }
+        return self.db_manager.get_distinct_values_many(['brand', 'segment', 'car_body_type'])
     
     def apply_filters(self, selected_filters: Dict[str, List[str]]) -> Dict[str, List[str]]:
         """
@@ -3,12 +3,19 @@ Module de visualisations des données avec Plotly.
 Crée les quatre KPI visualisations.
 """
 
-import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
 from typing import Optional
 
 
+# Mise en page commune aux figures des KPI, enregistrée une seule fois
+pio.templates["ev"] = go.layout.Template(
+    layout=dict(height=400, hovermode='x unified', showlegend=False)
+)
+EV_TEMPLATE = "plotly+ev"
+
+
 class VisualizationEngine:
     """Moteur de visualisation pour les KPI."""
     
@@ -26,20 +33,24 @@ class VisualizationEngine:
         if data.empty:
             return None
         
-        fig = px.bar(
-            data,
-            x='segment',
-            y='average_range_km',
-            title='Plage moyenne par segment (km)',
-            labels={'segment': 'Segment', 'average_range_km': 'Plage moyenne (km)'},
-            color='average_range_km',
-            color_continuous_scale='Viridis'
-        )
-        
-        fig.update_layout(
-            hovermode='x unified',
-            height=400,
-            showlegend=False
+        fig = go.Figure(
+            data=[go.Bar(
+                x=data['segment'],
+                y=data['average_range_km'],
+                marker=dict(
+                    color=data['average_range_km'],
+                    colorscale='Viridis',
+                    showscale=True,
+                    colorbar=dict(title='Plage moyenne (km)')
+                ),
+                hovertemplate='Segment=%{x}<br>Plage moyenne (km)=%{y}<extra></extra>'
+            )],
+            layout=dict(
+                template=EV_TEMPLATE,
+                title='Plage moyenne par segment (km)',
+                xaxis_title='Segment',
+                yaxis_title='Plage moyenne (km)'
+            )
         )
         
         return fig
@@ -58,24 +69,25 @@ class VisualizationEngine:
         if data.empty:
             return None
         
-        # Limiter à top 15 marques pour la lisibilité
-        data = data.head(15)
-        
-        fig = px.bar(
-            data,
-            x='brand',
-            y='average_acceleration_s',
-            title='Accélération moyenne par marque (0-100 km/h)',
-            labels={'brand': 'Marque', 'average_acceleration_s': 'Accélération (s)'},
-            color='average_acceleration_s',
-            color_continuous_scale='RdYlGn_r'
-        )
-        
-        fig.update_layout(
-            hovermode='x unified',
-            height=400,
-            xaxis_tickangle=-45,
-            showlegend=False
+        fig = go.Figure(
+            data=[go.Bar(
+                x=data['brand'],
+                y=data['average_acceleration_s'],
+                marker=dict(
+                    color=data['average_acceleration_s'],
+                    colorscale='RdYlGn_r',
+                    showscale=True,
+                    colorbar=dict(title='Accélération (s)')
+                ),
+                hovertemplate='Marque=%{x}<br>Accélération (s)=%{y}<extra></extra>'
+            )],
+            layout=dict(
+                template=EV_TEMPLATE,
+                title='Accélération moyenne par marque (0-100 km/h)',
+                xaxis_title='Marque',
+                yaxis_title='Accélération (s)',
+                xaxis_tickangle=-45
+            )
         )
         
         return fig
@@ -94,23 +106,34 @@ class VisualizationEngine:
         if data.empty:
             return None
         
-        fig = px.scatter(
-            data,
-            x='battery_capacity_kWh',
-            y='efficiency_wh_per_km',
-            color='segment',
-            hover_data=['brand', 'model'],
-            title='Capacité batterie vs Efficacité énergétique',
-            labels={
-                'battery_capacity_kWh': 'Capacité batterie (kWh)',
-                'efficiency_wh_per_km': 'Efficacité (Wh/km)',
-                'segment': 'Segment'
-            }
-        )
-        
-        fig.update_layout(
-            hovermode='closest',
-            height=400
+        # Une trace WebGL par segment, dans l'ordre d'apparition
+        traces = [
+            go.Scattergl(
+                x=group['battery_capacity_kWh'],
+                y=group['efficiency_wh_per_km'],
+                mode='markers',
+                name=str(segment),
+                customdata=group[['brand', 'model']],
+                hovertemplate=(
+                    f'Segment={segment}<br>Capacité batterie (kWh)=%{{x}}'
+                    '<br>Efficacité (Wh/km)=%{y}<br>brand=%{customdata[0]}'
+                    '<br>model=%{customdata[1]}<extra></extra>'
+                )
+            )
+            for segment, group in data.groupby('segment', sort=False, observed=True)
+        ]
+        
+        fig = go.Figure(
+            data=traces,
+            layout=dict(
+                template=EV_TEMPLATE,
+                title='Capacité batterie vs Efficacité énergétique',
+                xaxis_title='Capacité batterie (kWh)',
+                yaxis_title='Efficacité (Wh/km)',
+                legend_title='Segment',
+                hovermode='closest',
+                showlegend=True
+            )
         )
         
         return fig
@@ -129,22 +152,25 @@ class VisualizationEngine:
         if data.empty:
             return None
         
-        fig = px.pie(
-            data,
-            values='count',
-            names='car_body_type',
-            title='Distribution des véhicules par type de carrosserie',
-            labels={'car_body_type': 'Type de carrosserie', 'count': 'Nombre'},
-            hover_data={'percentage': ':.2f'}
+        fig = go.Figure(
+            data=[go.Pie(
+                labels=data['car_body_type'],
+                values=data['count'],
+                customdata=data['percentage'],
+                textposition='inside',
+                textinfo='label+percent',
+                hovertemplate=(
+                    'Type de carrosserie=%{label}<br>Nombre=%{value}'
+                    '<br>percentage=%{customdata:.2f}<extra></extra>'
+                )
+            )],
+            layout=dict(
+                template=EV_TEMPLATE,
+                title='Distribution des véhicules par type de carrosserie',
+                showlegend=True
+            )
         )
         
-        fig.update_traces(
-            textposition='inside',
-            textinfo='label+percent'
-        )
-        
-        fig.update_layout(height=400)
-        
         return fig
     
     @staticmethod
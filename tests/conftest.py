@@ -0,0 +1,175 @@
+"""
+Configuration partagée des tests.
+"""
+
+import pytest
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from src.database import DuckDBManager
+
+
+# Véhicules d'exemple, construits une seule fois pour toute la suite de tests
+SAMPLE_VEHICLES = pa.table({
+    'brand': ['Tesla', 'Tesla', 'BMW', 'Audi'],
+    'model': ['Model 3', 'Model Y', 'i4', 'e-tron'],
+    'top_speed_kmh': [225, 225, 200, 200],
+    'battery_capacity_kWh': [75.0, 75.0, 81.5, 100.0],
+    'battery_type': ['Lithium-ion'] * 4,
+    'number_of_cells': [4680] * 4,
+    'torque_nm': [450, 450, 400, 450],
+    'efficiency_wh_per_km': [150, 160, 170, 180],
+    'range_km': [500, 480, 450, 500],
+    'acceleration_0_100_s': [5.1, 5.8, 5.5, 5.2],
+    'fast_charging_power_kw_dc': [170, 170, 200, 150],
+    'fast_charge_port': ['CCS'] * 4,
+    'towing_capacity_kg': [0, 1600, 0, 1800],
+    'cargo_volume_l': [425, 425, 495, 660],
+    'seats': [5] * 4,
+    'drivetrain': ['RWD', 'RWD', 'RWD', 'AWD'],
+    'segment': ['C - Medium', 'JC - Medium', 'C - Medium', 'JC - Medium'],
+    'length_mm': [4694, 4751, 4783, 4901],
+    'width_mm': [1849, 1921, 1852, 1935],
+    'height_mm': [1443, 1624, 1454, 1616],
+    'car_body_type': ['Sedan', 'SUV', 'Sedan', 'SUV'],
+    'source_url': [
+        'https://example.com/tesla-model-3',
+        'https://example.com/tesla-model-y',
+        'https://example.com/bmw-i4',
+        'https://example.com/audi-etron',
+    ],
+})
+
+
+# Taille du jeu de données synthétique utilisé par les tests de performance
+LARGE_DATASET_ROWS = 100_000
+
+
+def _generate_vehicles(n_rows: int, seed: int = 42) -> pa.Table:
+    """
+    Génère un jeu de véhicules synthétique de façon vectorisée avec NumPy.
+    
+    Args:
+        n_rows: Nombre de véhicules à générer
+        seed: Graine du générateur aléatoire, pour des données reproductibles
+        
+    Returns:
+        Table Arrow au schéma de vehicle_data
+    """
+    rng = np.random.default_rng(seed)
+    
+    def uniform(low: float, high: float) -> np.ndarray:
+        return np.round(rng.uniform(low, high, n_rows), 1)
+    
+    return pa.table({
+        'brand': np.char.add('Brand ', rng.integers(0, 60, n_rows).astype(str)),
+        'model': np.char.add('Model ', np.arange(n_rows).astype(str)),
+        'top_speed_kmh': rng.integers(120, 260, n_rows),
+        'battery_capacity_kWh': uniform(20, 120),
+        'battery_type': np.full(n_rows, 'Lithium-ion'),
+        'number_of_cells': rng.integers(100, 8000, n_rows),
+        'torque_nm': rng.integers(150, 1000, n_rows),
+        'efficiency_wh_per_km': rng.integers(120, 260, n_rows),
+        'range_km': rng.integers(150, 700, n_rows),
+        'acceleration_0_100_s': uniform(2.5, 12.0),
+        'fast_charging_power_kw_dc': rng.integers(30, 350, n_rows),
+        'fast_charge_port': rng.choice(['CCS', 'CHAdeMO', 'NACS'], n_rows),
+        'towing_capacity_kg': rng.integers(0, 2500, n_rows),
+        'cargo_volume_l': rng.integers(200, 900, n_rows),
+        'seats': rng.integers(2, 8, n_rows),
+        'drivetrain': rng.choice(['RWD', 'FWD', 'AWD'], n_rows),
+        'segment': rng.choice(
+            ['A - Mini', 'B - Compact', 'C - Medium', 'D - Large', 'JC - Medium', 'JD - Large'],
+            n_rows
+        ),
+        'length_mm': rng.integers(3500, 5300, n_rows),
+        'width_mm': rng.integers(1600, 2100, n_rows),
+        'height_mm': rng.integers(1300, 1900, n_rows),
+        'car_body_type': rng.choice(['Sedan', 'SUV', 'Hatchback', 'Coupe', 'Station/Estate'], n_rows),
+        'source_url': np.full(n_rows, 'https://example.com/vehicle'),
+    })
+
+
+def pytest_configure(config):
+    """Déclare les marqueurs propres à la suite de tests et précharge les modules lourds."""
+    config.addinivalue_line(
+        "markers", "persistence: test nécessitant une base de données DuckDB sur disque"
+    )
+    config.addinivalue_line(
+        "markers", "performance: mesure pytest-benchmark, exclue de l'exécution par défaut"
+    )
+    
+    # Importer plotly, pandas et duckdb dès le démarrage (dans chaque worker xdist)
+    # pour que leur coût d'import ne soit pas attribué au premier test
+    import plotly.graph_objects  # noqa: F401
+    import pandas  # noqa: F401
+    import duckdb  # noqa: F401
+
+
+@pytest.fixture(scope="session")
+def sample_csv(tmp_path_factory):
+    """Fixture pour écrire les véhicules d'exemple en CSV, une seule fois par session."""
+    csv_file = tmp_path_factory.mktemp("data") / "test_vehicles.csv"
+    pacsv.write_csv(SAMPLE_VEHICLES, csv_file)
+    return str(csv_file)
+
+
+@pytest.fixture(scope="session")
+def large_vehicles():
+    """Fixture pour générer le jeu de véhicules synthétique, une seule fois par session."""
+    return _generate_vehicles(LARGE_DATASET_ROWS)
+
+
+@pytest.fixture(scope="session")
+def large_csv(tmp_path_factory, large_vehicles):
+    """Fixture pour écrire le jeu de véhicules synthétique en CSV, une seule fois par session."""
+    csv_file = tmp_path_factory.mktemp("data") / "large_vehicles.csv"
+    pacsv.write_csv(large_vehicles, csv_file)
+    return str(csv_file)
+
+
+@pytest.fixture(scope="session")
+def large_db_manager(large_vehicles):
+    """Fixture pour créer une instance de DuckDBManager en mémoire chargée avec le jeu synthétique."""
+    manager = DuckDBManager(":memory:")
+    manager.load_arrow(large_vehicles)
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def session_db_manager():
+    """Fixture pour créer une instance de DuckDBManager partagée, sur une BD vide en mémoire."""
+    manager = DuckDBManager(":memory:")
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(scope="session")
+def session_loaded_db_manager():
+    """Fixture pour créer une instance de DuckDBManager partagée en mémoire, chargée une seule fois."""
+    manager = DuckDBManager(":memory:")
+    manager.load_arrow(SAMPLE_VEHICLES)
+    yield manager
+    manager.close()
+
+
+def _in_rollback_transaction(manager):
+    """Exécute un test dans une transaction annulée à la fin pour isoler son état."""
+    manager.conn.execute("BEGIN TRANSACTION")
+    yield manager
+    manager.conn.execute("ROLLBACK")
+    # Le compteur de lignes et le cache sont tenus côté Python : les rétablir avec les données
+    manager.refresh_state()
+
+
+@pytest.fixture
+def db_manager(session_db_manager):
+    """Fixture pour une BD de test vide, isolée par transaction."""
+    yield from _in_rollback_transaction(session_db_manager)
+
+
+@pytest.fixture
+def loaded_db_manager(session_loaded_db_manager):
+    """Fixture pour une BD de test contenant les véhicules d'exemple, isolée par transaction."""
+    yield from _in_rollback_transaction(session_loaded_db_manager)
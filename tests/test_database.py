@@ -4,35 +4,58 @@ Tests unitaires pour le module database.py
 
 import pytest
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from src.database import DuckDBManager
+from src.database import DuckDBManager, VEHICLE_DATA_SCHEMA
+
+
+# En-tête CSV dans l'ordre des colonnes de vehicle_data
+CSV_HEADER = ",".join(VEHICLE_DATA_SCHEMA) + "\n"
+
+# Méthodes de calcul des KPI et colonnes attendues dans leur résultat
+KPI_CASES = [
+    ("calculate_kpi_1_range_by_segment", {'segment', 'average_range_km'}),
+    ("calculate_kpi_2_acceleration_by_brand", {'brand', 'average_acceleration_s'}),
+    ("calculate_kpi_3_battery_vs_efficiency",
+     {'battery_capacity_kWh', 'efficiency_wh_per_km', 'segment'}),
+    ("calculate_kpi_4_distribution_by_body_type", {'car_body_type', 'count', 'percentage'}),
+]
 
 
 @pytest.fixture
-def db_manager():
-    """Fixture pour créer une instance de DuckDBManager avec une BD de test."""
-    db_path = "test_ev_database.duckdb"
-    manager = DuckDBManager(db_path)
-    yield manager
-    manager.close()
-    # Nettoyer le fichier de test
-    if Path(db_path).exists():
-        Path(db_path).unlink()
+def db_file_path(tmp_path_factory, worker_id):
+    """Fixture pour le chemin d'une BD sur disque, réservée aux tests de persistance."""
+    # Un fichier distinct par worker pytest-xdist
+    return str(tmp_path_factory.mktemp("db") / f"test_ev_database_{worker_id}.duckdb")
+
+
+class RecordingConnection:
+    """Connexion DuckDB instrumentée qui enregistre les requêtes exécutées."""
+    
+    def __init__(self, conn):
+        self._conn = conn
+        self.statements = []
+    
+    def execute(self, query, parameters=None):
+        self.statements.append(query)
+        return self._conn.execute(query, parameters)
+    
+    def executemany(self, query, parameters=None):
+        raise AssertionError("Insertion ligne par ligne : le chargement doit se faire en bloc")
+    
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
 
 
 @pytest.fixture
-def sample_csv(tmp_path):
-    """Fixture pour créer un fichier CSV de test."""
-    csv_content = """brand,model,top_speed_kmh,battery_capacity_kWh,battery_type,number_of_cells,torque_nm,efficiency_wh_per_km,range_km,acceleration_0_100_s,fast_charging_power_kw_dc,fast_charge_port,towing_capacity_kg,cargo_volume_l,seats,drivetrain,segment,length_mm,width_mm,height_mm,car_body_type,source_url
-Tesla,Model 3,225,75.0,Lithium-ion,4680,450,150,500,5.1,170,CCS,0,425,5,RWD,C - Medium,4694,1849,1443,Sedan,https://example.com/tesla-model-3
-Tesla,Model Y,225,75.0,Lithium-ion,4680,450,160,480,5.8,170,CCS,1600,425,5,RWD,JC - Medium,4751,1921,1624,SUV,https://example.com/tesla-model-y
-BMW,i4,200,81.5,Lithium-ion,4680,400,170,450,5.5,200,CCS,0,495,5,RWD,C - Medium,4783,1852,1454,Sedan,https://example.com/bmw-i4
-Audi,e-tron,200,100.0,Lithium-ion,4680,450,180,500,5.2,150,CCS,1800,660,5,AWD,JC - Medium,4901,1935,1616,SUV,https://example.com/audi-etron
-"""
-    csv_file = tmp_path / "test_vehicles.csv"
-    csv_file.write_text(csv_content)
-    return str(csv_file)
+def recording_conn(db_manager, monkeypatch):
+    """Fixture qui remplace la connexion du gestionnaire par une connexion instrumentée."""
+    conn = RecordingConnection(db_manager.conn)
+    monkeypatch.setattr(db_manager, 'conn', conn)
+    return conn
 
 
 class TestDuckDBManager:
@@ -40,9 +63,14 @@ class TestDuckDBManager:
     
     def test_initialization(self, db_manager):
         """Test l'initialisation du gestionnaire de base de données."""
-        assert db_manager.db_path == "test_ev_database.duckdb"
+        assert db_manager.db_path == ":memory:"
         assert db_manager.conn is not None
     
+    def test_connection_config(self, db_manager):
+        """Test la configuration de la connexion DuckDB."""
+        threads = db_manager.conn.execute("SELECT current_setting('threads')").fetchone()[0]
+        assert threads == (os.cpu_count() or 1)
+    
     def test_create_schema(self, db_manager):
         """Test la création du schéma."""
         # Vérifier que la table existe
@@ -52,6 +80,14 @@ class TestDuckDBManager:
         """).fetchone()
         assert result[0] == 1
     
+    def test_create_schema_without_indexes(self, db_manager):
+        """Test qu'aucun index n'est créé sur la table."""
+        result = db_manager.conn.execute("""
+            SELECT COUNT(*) FROM duckdb_indexes()
+            WHERE table_name = 'vehicle_data'
+        """).fetchone()
+        assert result[0] == 0
+    
     def test_load_csv(self, db_manager, sample_csv):
         """Test le chargement d'un fichier CSV."""
         record_count = db_manager.load_csv(sample_csv)
@@ -61,103 +97,276 @@ class TestDuckDBManager:
         total = db_manager.get_record_count()
         assert total == 4
     
-    def test_get_distinct_values(self, db_manager, sample_csv):
-        """Test la récupération des valeurs distinctes."""
+    def test_load_csv_uses_bulk_read(self, db_manager, recording_conn, sample_csv):
+        """Test que load_csv insère en bloc depuis read_csv, sans executemany."""
         db_manager.load_csv(sample_csv)
         
-        brands = db_manager.get_distinct_values('brand')
+        inserts = [sql for sql in recording_conn.statements if 'INSERT INTO vehicle_data' in sql]
+        assert len(inserts) == 1
+        assert 'read_csv(' in inserts[0]
+    
+    def test_load_csv_reordered_columns(self, db_manager, sample_csv, tmp_path):
+        """Test que les colonnes du CSV sont associées par leur nom, quel que soit leur ordre."""
+        table = pacsv.read_csv(sample_csv)
+        names = table.column_names
+        csv_file = tmp_path / "reordered.csv"
+        pacsv.write_csv(table.select([names[1], names[0]] + names[2:]), csv_file)
+        
+        assert db_manager.load_csv(str(csv_file)) == 4
+        result = db_manager.query_with_filters({'brand': ['BMW']})
+        assert result['model'].tolist() == ['i4']
+        assert result['battery_capacity_kWh'].iloc[0] == 81.5
+        
+        # Même résultat que le chargement en mémoire, qui associe aussi les colonnes par nom
+        db_manager.clear_all_data()
+        db_manager.load_csv_bytes(csv_file.read_bytes())
+        pd.testing.assert_frame_equal(db_manager.query_with_filters({'brand': ['BMW']}), result)
+    
+    def test_load_csv_bytes(self, db_manager, sample_csv):
+        """Test le chargement d'un CSV reçu en mémoire."""
+        record_count = db_manager.load_csv_bytes(Path(sample_csv).read_bytes())
+        assert record_count == 4
+        assert db_manager.get_record_count() == 4
+    
+    def test_load_csv_skips_missing_required_values(self, db_manager, tmp_path):
+        """Test que les lignes sans marque ou sans segment ne sont pas chargées."""
+        csv_file = tmp_path / "missing_values.csv"
+        csv_file.write_text(
+            CSV_HEADER +
+            "Tesla,Model 3,225,75.0,Lithium-ion,4680,450,150,500,5.1,170,CCS,0,425,5,RWD,C - Medium,4694,1849,1443,Sedan,https://example.com/tesla-model-3\n"
+            ",Model Y,225,75.0,Lithium-ion,4680,450,160,480,5.8,170,CCS,1600,425,5,RWD,JC - Medium,4751,1921,1624,SUV,https://example.com/tesla-model-y\n"
+            "BMW,i4,200,81.5,Lithium-ion,4680,400,170,450,5.5,200,CCS,0,495,5,RWD,,4783,1852,1454,Sedan,https://example.com/bmw-i4\n"
+        )
+        
+        assert db_manager.load_csv(str(csv_file)) == 1
+        assert db_manager.get_record_count() == 1
+    
+    def test_load_arrow(self, db_manager, sample_csv):
+        """Test le chargement d'une table Arrow."""
+        table = pacsv.read_csv(sample_csv)
+        
+        assert db_manager.load_arrow(table) == 4
+        result = db_manager.query_with_filters({'brand': ['BMW']})
+        assert result['battery_capacity_kWh'].iloc[0] == 81.5
+    
+    def test_load_csv_invalid_numeric(self, db_manager, tmp_path):
+        """Test qu'une valeur numérique invalide est chargée comme NULL."""
+        csv_file = tmp_path / "invalid_numeric.csv"
+        csv_file.write_text(
+            CSV_HEADER +
+            "Tesla,Model 3,225,75.0,Lithium-ion,4680,450,150,n/a,5.1,170,CCS,0,425,5,RWD,C - Medium,4694,1849,1443,Sedan,https://example.com/tesla-model-3\n"
+        )
+        
+        assert db_manager.load_csv(str(csv_file)) == 1
+        result = db_manager.query_with_filters({})
+        assert pd.isna(result['range_km'].iloc[0])
+        assert result['top_speed_kmh'].iloc[0] == 225
+    
+    def test_get_distinct_values(self, loaded_db_manager):
+        """Test la récupération des valeurs distinctes."""
+        brands = loaded_db_manager.get_distinct_values('brand')
         assert len(brands) == 3
         assert 'Tesla' in brands
         assert 'BMW' in brands
         assert 'Audi' in brands
     
-    def test_query_with_filters_no_filters(self, db_manager, sample_csv):
-        """Test la requête sans filtres."""
+    def test_get_distinct_values_many(self, loaded_db_manager):
+        """Test la récupération des valeurs distinctes de plusieurs colonnes."""
+        result = loaded_db_manager.get_distinct_values_many(['brand', 'car_body_type'])
+        assert result == {
+            'brand': ['Audi', 'BMW', 'Tesla'],
+            'car_body_type': ['SUV', 'Sedan'],
+        }
+    
+    def test_get_distinct_values_many_empty_db(self, db_manager):
+        """Test la récupération des valeurs distinctes avec une BD vide."""
+        result = db_manager.get_distinct_values_many(['brand', 'segment'])
+        assert result == {'brand': [], 'segment': []}
+    
+    def test_get_distinct_values_cached(self, loaded_db_manager, monkeypatch):
+        """Test que les valeurs distinctes ne sont calculées qu'une fois."""
+        loaded_db_manager.get_distinct_values_many(['brand', 'segment'])
+        conn = RecordingConnection(loaded_db_manager.conn)
+        monkeypatch.setattr(loaded_db_manager, 'conn', conn)
+        
+        assert loaded_db_manager.get_distinct_values('brand') == ['Audi', 'BMW', 'Tesla']
+        loaded_db_manager.get_distinct_values_many(['brand', 'segment'])
+        assert conn.statements == []
+    
+    def test_get_distinct_values_cache_invalidated(self, db_manager, sample_csv):
+        """Test que le cache des valeurs distinctes est invalidé au chargement et à l'effacement."""
+        assert db_manager.get_distinct_values('brand') == []
+        
         db_manager.load_csv(sample_csv)
+        assert db_manager.get_distinct_values('brand') == ['Audi', 'BMW', 'Tesla']
         
-        result = db_manager.query_with_filters({})
+        db_manager.clear_all_data()
+        assert db_manager.get_distinct_values('brand') == []
+    
+    def test_refresh_state_after_rollback(self, sample_csv):
+        """Test que refresh_state rétablit le compteur et le cache après un ROLLBACK externe."""
+        manager = DuckDBManager(":memory:")
+        manager.load_csv(sample_csv)
+        table = pacsv.read_csv(sample_csv)
+        kia = table.set_column(0, 'brand', pa.array(['Kia'] * table.num_rows))
+        
+        manager.conn.execute("BEGIN TRANSACTION")
+        manager.clear_all_data()
+        manager.load_arrow(kia)
+        assert manager.get_distinct_values('brand') == ['Kia']
+        manager.conn.execute("ROLLBACK")
+        
+        manager.refresh_state()
+        assert manager.get_record_count() == 4
+        assert manager.get_distinct_values('brand') == ['Audi', 'BMW', 'Tesla']
+        manager.close()
+    
+    def test_query_with_filters_no_filters(self, loaded_db_manager):
+        """Test la requête sans filtres."""
+        result = loaded_db_manager.query_with_filters({})
         assert len(result) == 4
     
-    def test_query_with_filters_single_brand(self, db_manager, sample_csv):
+    def test_query_with_filters_single_brand(self, loaded_db_manager):
         """Test la requête avec un filtre sur la marque."""
-        db_manager.load_csv(sample_csv)
-        
-        result = db_manager.query_with_filters({'brand': ['Tesla']})
+        result = loaded_db_manager.query_with_filters({'brand': ['Tesla']})
         assert len(result) == 2
-        assert all(result['brand'] == 'Tesla')
+        assert (result['brand'].to_numpy() == 'Tesla').all()
     
-    def test_query_with_filters_multiple_brands(self, db_manager, sample_csv):
+    def test_query_with_filters_multiple_brands(self, loaded_db_manager):
         """Test la requête avec plusieurs marques."""
-        db_manager.load_csv(sample_csv)
-        
-        result = db_manager.query_with_filters({'brand': ['Tesla', 'BMW']})
+        result = loaded_db_manager.query_with_filters({'brand': ['Tesla', 'BMW']})
         assert len(result) == 3
     
-    def test_query_with_filters_body_type(self, db_manager, sample_csv):
+    def test_query_with_filters_body_type(self, loaded_db_manager):
         """Test la requête avec filtre sur le type de carrosserie."""
-        db_manager.load_csv(sample_csv)
-        
-        result = db_manager.query_with_filters({'car_body_type': ['SUV']})
+        result = loaded_db_manager.query_with_filters({'car_body_type': ['SUV']})
         assert len(result) == 2
-        assert all(result['car_body_type'] == 'SUV')
+        assert (result['car_body_type'].to_numpy() == 'SUV').all()
     
-    def test_calculate_kpi_1_range_by_segment(self, db_manager, sample_csv):
-        """Test le calcul du KPI 1 (plage par segment)."""
-        db_manager.load_csv(sample_csv)
+    def test_query_with_filters_arrow(self, loaded_db_manager):
+        """Test que le chemin Arrow renvoie les mêmes données que le chemin pandas."""
+        filters = {'brand': ['Tesla', 'BMW']}
+        table = loaded_db_manager.query_with_filters_arrow(filters)
+        df = loaded_db_manager.query_with_filters(filters)
         
-        result = db_manager.calculate_kpi_1_range_by_segment({})
+        assert isinstance(table, pa.Table)
+        assert table.column_names == list(df.columns)
+        assert table.column('model').to_pylist() == df['model'].tolist()
+        assert table.column('brand').to_pylist() == df['brand'].astype(str).tolist()
+        assert [float(v) for v in table.column('battery_capacity_kWh').to_pylist()] == \
+            df['battery_capacity_kWh'].tolist()
+    
+    def test_concurrent_queries(self, loaded_db_manager):
+        """Test que des requêtes lancées depuis plusieurs threads ne mélangent pas leurs résultats."""
+        def run(i):
+            if i % 2:
+                result = loaded_db_manager.query_with_filters({'brand': ['Tesla']})
+                return list(result.columns) == list(expected_query.columns) and \
+                    (result['brand'].to_numpy() == 'Tesla').all()
+            result = loaded_db_manager.calculate_kpi_1_range_by_segment({})
+            return result.equals(expected_kpi)
+        
+        expected_query = loaded_db_manager.query_with_filters({'brand': ['Tesla']})
+        expected_kpi = loaded_db_manager.calculate_kpi_1_range_by_segment({})
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(run, range(400)))
+        
+        assert all(results)
+    
+    def test_query_with_filters_categorical_columns(self, loaded_db_manager):
+        """Test que les colonnes à faible cardinalité sont de type category."""
+        result = loaded_db_manager.query_with_filters({})
+        assert isinstance(result['brand'].dtype, pd.CategoricalDtype)
+        assert isinstance(result['segment'].dtype, pd.CategoricalDtype)
+        assert not isinstance(result['model'].dtype, pd.CategoricalDtype)
+    
+    def test_query_with_filters_value_with_quote(self, loaded_db_manager):
+        """Test qu'une valeur contenant une apostrophe est passée en paramètre."""
+        result = loaded_db_manager.query_with_filters({'brand': ["O'Brien", 'Tesla']})
+        assert len(result) == 2
+    
+    @pytest.mark.parametrize("method, expected_columns", KPI_CASES)
+    def test_calculate_kpi(self, loaded_db_manager, method, expected_columns):
+        """Test le calcul de chaque KPI sur les véhicules d'exemple."""
+        result = getattr(loaded_db_manager, method)({})
         assert not result.empty
-        assert 'segment' in result.columns
-        assert 'average_range_km' in result.columns
-        assert len(result) > 0
+        assert expected_columns.issubset(result.columns)
+    
+    def test_calculate_kpi_1_values(self, loaded_db_manager):
+        """Test les moyennes calculées par le KPI 1 et leur ordre."""
+        result = loaded_db_manager.calculate_kpi_1_range_by_segment({})
+        assert list(result['segment']) == ['JC - Medium', 'C - Medium']
+        assert list(result['average_range_km']) == [490.0, 475.0]
     
-    def test_calculate_kpi_1_with_filters(self, db_manager, sample_csv):
+    def test_calculate_kpi_1_with_filters(self, loaded_db_manager):
         """Test le calcul du KPI 1 avec filtres."""
-        db_manager.load_csv(sample_csv)
-        
-        result = db_manager.calculate_kpi_1_range_by_segment({'brand': ['Tesla']})
+        result = loaded_db_manager.calculate_kpi_1_range_by_segment({'brand': ['Tesla']})
         assert not result.empty
     
-    def test_calculate_kpi_2_acceleration_by_brand(self, db_manager, sample_csv):
-        """Test le calcul du KPI 2 (accélération par marque)."""
-        db_manager.load_csv(sample_csv)
+    def test_calculate_kpi_2_top_15_brands(self, db_manager, sample_csv):
+        """Test que le KPI 2 ne retourne que les 15 marques les plus rapides."""
+        # 20 copies du premier véhicule, chacune avec sa marque et son accélération
+        table = pacsv.read_csv(sample_csv).take([0] * 20)
+        table = table.set_column(
+            table.column_names.index('brand'), 'brand', pa.array([f"Brand{i}" for i in range(20)])
+        )
+        table = table.set_column(
+            table.column_names.index('acceleration_0_100_s'), 'acceleration_0_100_s',
+            pa.array([5.0 + i * 0.1 for i in range(20)])
+        )
+        db_manager.load_arrow(table)
         
         result = db_manager.calculate_kpi_2_acceleration_by_brand({})
-        assert not result.empty
-        assert 'brand' in result.columns
-        assert 'average_acceleration_s' in result.columns
+        assert len(result) == 15
+        assert result['brand'].iloc[0] == 'Brand0'
+        assert result['average_acceleration_s'].is_monotonic_increasing
     
-    def test_calculate_kpi_3_battery_vs_efficiency(self, db_manager, sample_csv):
-        """Test le calcul du KPI 3 (batterie vs efficacité)."""
-        db_manager.load_csv(sample_csv)
-        
-        result = db_manager.calculate_kpi_3_battery_vs_efficiency({})
-        assert not result.empty
-        assert 'battery_capacity_kWh' in result.columns
-        assert 'efficiency_wh_per_km' in result.columns
-        assert 'segment' in result.columns
+    def test_calculate_kpi_3_projection(self, loaded_db_manager):
+        """Test que le KPI 3 ne sélectionne que les colonnes nécessaires."""
+        result = loaded_db_manager.calculate_kpi_3_battery_vs_efficiency({'brand': ['Tesla']})
+        assert list(result.columns) == [
+            'battery_capacity_kWh', 'efficiency_wh_per_km', 'segment', 'brand', 'model'
+        ]
+        assert len(result) == 2
     
-    def test_calculate_kpi_4_distribution_by_body_type(self, db_manager, sample_csv):
-        """Test le calcul du KPI 4 (distribution par type)."""
-        db_manager.load_csv(sample_csv)
-        
-        result = db_manager.calculate_kpi_4_distribution_by_body_type({})
-        assert not result.empty
-        assert 'car_body_type' in result.columns
-        assert 'count' in result.columns
-        assert 'percentage' in result.columns
+    def test_calculate_kpi_4_total_percentage(self, loaded_db_manager):
+        """Test que les pourcentages du KPI 4 totalisent 100%."""
+        result = loaded_db_manager.calculate_kpi_4_distribution_by_body_type({})
         
-        # Vérifier que les pourcentages totalisent 100%
         total_percentage = result['percentage'].sum()
-        assert abs(total_percentage - 100.0) < 0.01
+        assert total_percentage == pytest.approx(100.0, abs=0.01)
+    
+    def test_calculate_kpi_4_percentages(self, loaded_db_manager):
+        """Test les comptes et pourcentages calculés par le KPI 4."""
+        result = loaded_db_manager.calculate_kpi_4_distribution_by_body_type({'brand': ['Tesla', 'BMW']})
+        assert list(result['car_body_type']) == ['Sedan', 'SUV']
+        assert list(result['count']) == [2, 1]
+        assert list(result['percentage']) == [66.67, 33.33]
+    
+    def test_calculate_all_kpis(self, loaded_db_manager):
+        """Test que le calcul des quatre KPI correspond aux calculs individuels."""
+        for filters in ({}, {'car_body_type': ['SUV']}, {'brand': ['NonExistent']}):
+            result = loaded_db_manager.calculate_all_kpis(filters)
+            pd.testing.assert_frame_equal(
+                result['kpi_1'], loaded_db_manager.calculate_kpi_1_range_by_segment(filters)
+            )
+            pd.testing.assert_frame_equal(
+                result['kpi_2'], loaded_db_manager.calculate_kpi_2_acceleration_by_brand(filters)
+            )
+            pd.testing.assert_frame_equal(
+                result['kpi_3'], loaded_db_manager.calculate_kpi_3_battery_vs_efficiency(filters)
+            )
+            pd.testing.assert_frame_equal(
+                result['kpi_4'], loaded_db_manager.calculate_kpi_4_distribution_by_body_type(filters)
+            )
     
-    def test_clear_all_data(self, db_manager, sample_csv):
+    def test_clear_all_data(self, loaded_db_manager):
         """Test la suppression de toutes les données."""
-        db_manager.load_csv(sample_csv)
-        assert db_manager.get_record_count() == 4
+        assert loaded_db_manager.get_record_count() == 4
         
-        db_manager.clear_all_data()
-        assert db_manager.get_record_count() == 0
+        loaded_db_manager.clear_all_data()
+        assert loaded_db_manager.get_record_count() == 0
     
     def test_get_record_count(self, db_manager, sample_csv):
         """Test le comptage des enregistrements."""
@@ -166,17 +375,26 @@ class TestDuckDBManager:
         db_manager.load_csv(sample_csv)
         assert db_manager.get_record_count() == 4
     
-    def test_empty_query_result(self, db_manager, sample_csv):
-        """Test une requête qui ne retourne aucun résultat."""
-        db_manager.load_csv(sample_csv)
+    @pytest.mark.persistence
+    def test_get_record_count_existing_database(self, db_file_path, sample_csv):
+        """Test que le comptage reprend les données d'une base existante."""
+        manager = DuckDBManager(db_file_path)
+        manager.load_csv(sample_csv)
+        manager.close()
         
-        result = db_manager.query_with_filters({'brand': ['NonExistent']})
+        reopened = DuckDBManager(db_file_path)
+        try:
+            assert reopened.get_record_count() == 4
+        finally:
+            reopened.close()
+    
+    def test_empty_query_result(self, loaded_db_manager):
+        """Test une requête qui ne retourne aucun résultat."""
+        result = loaded_db_manager.query_with_filters({'brand': ['NonExistent']})
         assert result.empty
     
-    def test_kpi_with_empty_result(self, db_manager, sample_csv):
+    def test_kpi_with_empty_result(self, loaded_db_manager):
         """Test les KPI avec des résultats vides."""
-        db_manager.load_csv(sample_csv)
-        
         # Filtre qui ne retourne rien
-        result = db_manager.calculate_kpi_1_range_by_segment({'brand': ['NonExistent']})
+        result = loaded_db_manager.calculate_kpi_1_range_by_segment({'brand': ['NonExistent']})
         assert result.empty
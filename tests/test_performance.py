@@ -0,0 +1,77 @@
+"""
+Tests de performance du module database.py, avec pytest-benchmark.
+
+Ces tests portent le marqueur 'performance' et sont exclus de l'exécution par
+défaut (voir pytest.ini). pytest-benchmark désactivant les mesures sous pytest-xdist,
+ils s'exécutent dans un seul processus :
+
+    pytest tests/test_performance.py -n 0 -m performance
+"""
+
+import pytest
+from src.database import DuckDBManager
+
+
+# Durées moyennes maximales (en secondes) sur le jeu synthétique, larges par rapport
+# aux durées mesurées : seul un changement d'ordre de grandeur doit les dépasser
+LOAD_CSV_MAX_MEAN_S = 2.0
+QUERY_MAX_MEAN_S = 0.5
+KPI_MAX_MEAN_S = 0.5
+
+pytestmark = pytest.mark.performance
+
+KPI_METHODS = [
+    "calculate_kpi_1_range_by_segment",
+    "calculate_kpi_2_acceleration_by_brand",
+    "calculate_kpi_3_battery_vs_efficiency",
+    "calculate_kpi_4_distribution_by_body_type",
+    "calculate_all_kpis",
+]
+
+
+def assert_mean_below(benchmark, max_mean_s: float):
+    """Vérifie la durée moyenne mesurée, ou signale le test comme ignoré si les mesures sont inactives."""
+    if benchmark.stats is None:
+        pytest.skip("mesures pytest-benchmark désactivées (pytest-xdist ou --benchmark-disable)")
+    
+    assert benchmark.stats['mean'] < max_mean_s
+
+
+@pytest.fixture
+def empty_db_manager():
+    """Fixture pour une BD vide en mémoire, dédiée aux mesures de chargement."""
+    manager = DuckDBManager(":memory:")
+    yield manager
+    manager.close()
+
+
+@pytest.mark.benchmark(group="load")
+def test_load_csv_performance(benchmark, empty_db_manager, large_csv, large_vehicles):
+    """Mesure le chargement en bloc d'un CSV de grande taille."""
+    inserted = benchmark.pedantic(
+        empty_db_manager.load_csv, args=(large_csv,),
+        setup=empty_db_manager.clear_all_data, rounds=5
+    )
+    
+    assert inserted == large_vehicles.num_rows
+    assert_mean_below(benchmark, LOAD_CSV_MAX_MEAN_S)
+
+
+@pytest.mark.benchmark(group="query")
+def test_query_with_filters_performance(benchmark, large_db_manager):
+    """Mesure une requête filtrée sur le jeu synthétique."""
+    filters = {'brand': ['Brand 1', 'Brand 2'], 'car_body_type': ['SUV']}
+    result = benchmark(large_db_manager.query_with_filters, filters)
+    
+    assert len(result) > 0
+    assert_mean_below(benchmark, QUERY_MAX_MEAN_S)
+
+
+@pytest.mark.benchmark(group="kpi")
+@pytest.mark.parametrize("kpi_method", KPI_METHODS)
+def test_kpi_performance(benchmark, large_db_manager, kpi_method):
+    """Mesure le calcul des KPI sur le jeu synthétique, sans filtre."""
+    result = benchmark(getattr(large_db_manager, kpi_method), {})
+    
+    assert len(result) > 0
+    assert_mean_below(benchmark, KPI_MAX_MEAN_S)
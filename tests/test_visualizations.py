@@ -3,61 +3,88 @@ Tests unitaires pour le module visualizations.py
 """
 
 import pytest
+import numpy as np
 import pandas as pd
 from src.visualizations import VisualizationEngine
 
 
+# Données de 20 marques pour le KPI 2, générées une seule fois
+BRANDS_20 = np.char.add("Brand", np.arange(20).astype(str))
+ACCELERATIONS_20 = np.arange(20, dtype=np.float64) * 0.1 + 5.0
+
+
+@pytest.fixture(scope="module")
+def viz_engine():
+    """Fixture pour créer une instance de VisualizationEngine, partagée par le module."""
+    return VisualizationEngine()
+
+
+@pytest.fixture(scope="module")
+def sample_kpi1_data():
+    """Fixture pour les données du KPI 1."""
+    return pd.DataFrame({
+        'segment': ['C - Medium', 'JC - Medium', 'B - Compact'],
+        'average_range_km': [500.0, 480.0, 320.0]
+    })
+
+
+@pytest.fixture(scope="module")
+def sample_kpi2_data():
+    """Fixture pour les données du KPI 2."""
+    return pd.DataFrame({
+        'brand': ['Tesla', 'BMW', 'Audi', 'Mercedes'],
+        'average_acceleration_s': [5.1, 5.5, 5.2, 5.8]
+    })
+
+
+@pytest.fixture(scope="module")
+def kpi2_data_20_brands():
+    """Fixture pour les données du KPI 2 sur 20 marques, adossées aux tableaux NumPy sans copie."""
+    return pd.DataFrame({
+        'brand': BRANDS_20,
+        'average_acceleration_s': ACCELERATIONS_20
+    }, copy=False)
+
+
+@pytest.fixture(scope="module")
+def sample_kpi3_data():
+    """Fixture pour les données du KPI 3."""
+    return pd.DataFrame({
+        'battery_capacity_kWh': [75.0, 81.5, 100.0, 60.0],
+        'efficiency_wh_per_km': [150, 170, 180, 160],
+        'segment': ['C - Medium', 'C - Medium', 'JC - Medium', 'B - Compact'],
+        'brand': ['Tesla', 'BMW', 'Audi', 'Renault'],
+        'model': ['Model 3', 'i4', 'e-tron', 'Zoe']
+    })
+
+
+@pytest.fixture(scope="module")
+def sample_kpi4_data():
+    """Fixture pour les données du KPI 4."""
+    return pd.DataFrame({
+        'car_body_type': ['Sedan', 'SUV', 'Hatchback'],
+        'count': [50, 35, 15],
+        'percentage': [50.0, 35.0, 15.0]
+    })
+
+
 class TestVisualizationEngine:
     """Tests pour la classe VisualizationEngine."""
     
-    @pytest.fixture
-    def viz_engine(self):
-        """Fixture pour créer une instance de VisualizationEngine."""
-        return VisualizationEngine()
-    
-    @pytest.fixture
-    def sample_kpi1_data(self):
-        """Fixture pour les données du KPI 1."""
-        return pd.DataFrame({
-            'segment': ['C - Medium', 'JC - Medium', 'B - Compact'],
-            'average_range_km': [500.0, 480.0, 320.0]
-        })
-    
-    @pytest.fixture
-    def sample_kpi2_data(self):
-        """Fixture pour les données du KPI 2."""
-        return pd.DataFrame({
-            'brand': ['Tesla', 'BMW', 'Audi', 'Mercedes'],
-            'average_acceleration_s': [5.1, 5.5, 5.2, 5.8]
-        })
-    
-    @pytest.fixture
-    def sample_kpi3_data(self):
-        """Fixture pour les données du KPI 3."""
-        return pd.DataFrame({
-            'battery_capacity_kWh': [75.0, 81.5, 100.0, 60.0],
-            'efficiency_wh_per_km': [150, 170, 180, 160],
-            'segment': ['C - Medium', 'C - Medium', 'JC - Medium', 'B - Compact'],
-            'brand': ['Tesla', 'BMW', 'Audi', 'Renault'],
-            'model': ['Model 3', 'i4', 'e-tron', 'Zoe']
-        })
-    
-    @pytest.fixture
-    def sample_kpi4_data(self):
-        """Fixture pour les données du KPI 4."""
-        return pd.DataFrame({
-            'car_body_type': ['Sedan', 'SUV', 'Hatchback'],
-            'count': [50, 35, 15],
-            'percentage': [50.0, 35.0, 15.0]
-        })
-    
     def test_render_kpi_1_range_by_segment(self, viz_engine, sample_kpi1_data):
         """Test la visualisation du KPI 1."""
         fig = viz_engine.render_kpi_1_range_by_segment(sample_kpi1_data)
         
         assert fig is not None
-        assert fig.data is not None
-        assert len(fig.data) > 0
+        assert len(fig.to_plotly_json()['data']) > 0
+    
+    def test_render_kpi_1_uses_shared_template(self, viz_engine, sample_kpi1_data):
+        """Test que le KPI 1 utilise le modèle de mise en page commun."""
+        fig = viz_engine.render_kpi_1_range_by_segment(sample_kpi1_data)
+        
+        spec = fig.to_plotly_json()
+        assert spec['data'][0]['type'] == 'bar'
+        assert spec['layout']['template']['layout']['height'] == 400
     
     def test_render_kpi_1_empty_data(self, viz_engine):
         """Test la visualisation du KPI 1 avec données vides."""
@@ -71,8 +98,7 @@ class TestVisualizationEngine:
         fig = viz_engine.render_kpi_2_acceleration_by_brand(sample_kpi2_data)
         
         assert fig is not None
-        assert fig.data is not None
-        assert len(fig.data) > 0
+        assert len(fig.to_plotly_json()['data']) > 0
     
     def test_render_kpi_2_empty_data(self, viz_engine):
         """Test la visualisation du KPI 2 avec données vides."""
@@ -81,26 +107,26 @@ class TestVisualizationEngine:
         
         assert fig is None
     
-    def test_render_kpi_2_more_than_15_brands(self, viz_engine):
+    def test_render_kpi_2_more_than_15_brands(self, viz_engine, kpi2_data_20_brands):
         """Test la visualisation du KPI 2 avec plus de 15 marques."""
-        data = pd.DataFrame({
-            'brand': [f'Brand{i}' for i in range(20)],
-            'average_acceleration_s': [5.0 + i*0.1 for i in range(20)]
-        })
-        
-        fig = viz_engine.render_kpi_2_acceleration_by_brand(data)
+        fig = viz_engine.render_kpi_2_acceleration_by_brand(kpi2_data_20_brands)
         
         assert fig is not None
-        # Vérifier que seules les 15 premières marques sont affichées
-        assert len(fig.data[0].x) <= 15
+        # La limite à 15 marques est appliquée par la requête SQL du KPI 2
+        assert len(fig.to_plotly_json()['data'][0]['x']) == 20
     
     def test_render_kpi_3_battery_vs_efficiency(self, viz_engine, sample_kpi3_data):
         """Test la visualisation du KPI 3."""
         fig = viz_engine.render_kpi_3_battery_vs_efficiency(sample_kpi3_data)
         
         assert fig is not None
-        assert fig.data is not None
-        assert len(fig.data) > 0
+        assert len(fig.to_plotly_json()['data']) > 0
+    
+    def test_render_kpi_3_uses_webgl(self, viz_engine, sample_kpi3_data):
+        """Test que le KPI 3 utilise des traces WebGL."""
+        fig = viz_engine.render_kpi_3_battery_vs_efficiency(sample_kpi3_data)
+        
+        assert all(trace['type'] == 'scattergl' for trace in fig.to_plotly_json()['data'])
     
     def test_render_kpi_3_empty_data(self, viz_engine):
         """Test la visualisation du KPI 3 avec données vides."""
@@ -114,8 +140,7 @@ class TestVisualizationEngine:
         fig = viz_engine.render_kpi_4_distribution_by_body_type(sample_kpi4_data)
         
         assert fig is not None
-        assert fig.data is not None
-        assert len(fig.data) > 0
+        assert len(fig.to_plotly_json()['data']) > 0
     
     def test_render_kpi_4_empty_data(self, viz_engine):
         """Test la visualisation du KPI 4 avec données vides."""
@@ -135,22 +160,26 @@ class TestVisualizationEngine:
         """Test que le titre du KPI 1 est correct."""
         fig = viz_engine.render_kpi_1_range_by_segment(sample_kpi1_data)
         
-        assert "Plage moyenne par segment" in fig.layout.title.text
+        spec = fig.to_plotly_json()
+        assert "Plage moyenne par segment" in spec['layout']['title']['text']
     
     def test_kpi_2_title(self, viz_engine, sample_kpi2_data):
         """Test que le titre du KPI 2 est correct."""
         fig = viz_engine.render_kpi_2_acceleration_by_brand(sample_kpi2_data)
         
-        assert "Accélération moyenne par marque" in fig.layout.title.text
+        spec = fig.to_plotly_json()
+        assert "Accélération moyenne par marque" in spec['layout']['title']['text']
     
     def test_kpi_3_title(self, viz_engine, sample_kpi3_data):
         """Test que le titre du KPI 3 est correct."""
         fig = viz_engine.render_kpi_3_battery_vs_efficiency(sample_kpi3_data)
         
-        assert "Capacité batterie vs Efficacité" in fig.layout.title.text
+        spec = fig.to_plotly_json()
+        assert "Capacité batterie vs Efficacité" in spec['layout']['title']['text']
     
     def test_kpi_4_title(self, viz_engine, sample_kpi4_data):
         """Test que le titre du KPI 4 est correct."""
         fig = viz_engine.render_kpi_4_distribution_by_body_type(sample_kpi4_data)
         
-        assert "Distribution des véhicules par type de carrosserie" in fig.layout.title.text
+        spec = fig.to_plotly_json()
+        assert "Distribution des véhicules par type de carrosserie" in spec['layout']['title']['text']